@@ -19,17 +19,29 @@ os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = os.path.join(
 project_id = 'weighty-triode-456314-m7'
 location = 'us-central1'
 
-async def init_vertexai():
+# Resolve the model name once at import; init_vertexai fails fast on a
+# missing value so OpenAI-only deployments can import this module
+VERTEX_MODEL = os.getenv("VERTEX_GEMINI_MODEL")
+
+def init_vertexai():
     """
     Initialize the Vertex AI client and load the Gemini model.
-    
+
+    This does no awaitable work, so it is a plain function meant to be
+    called once at application startup rather than per request.
+
     Returns:
         GenerativeModel: An instance of the Gemini 1.5 Pro model
     """
+    # Fail fast with a clear message instead of requesting model "None"
+    if VERTEX_MODEL is None:
+        raise RuntimeError(
+            "VERTEX_GEMINI_MODEL must be set when using the vertex provider")
+
     # Initialize Vertex AI with project and location
     vertexai.init(project=project_id, location=location)
     
     # Load the Gemini 1.5 Pro model
-    model = GenerativeModel(os.getenv("VERTEX_GEMINI_MODEL"))
+    model = GenerativeModel(VERTEX_MODEL)
     
     return model
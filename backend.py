@@ -1,63 +1,422 @@
+import asyncio
+import hashlib
+import json
 import os
 
-import requests
+from collections import OrderedDict
+
+import httpx
+import orjson
 import uvicorn
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-# from openai import OpenAI
+from openai import AsyncOpenAI
 
 from dotenv import load_dotenv
 from pathlib import Path
 
 from vertexai.preview.generative_models import GenerationConfig
-from auth import init_vertexai
+from auth import init_vertexai, VERTEX_MODEL
 
 # Load .env from the root directory
 env_path = Path('..') / '.env'
 load_dotenv(dotenv_path=env_path)
 
-# Initialize FastAPI app
-app = FastAPI()
+# Read the Dev.to credentials once at import and fail fast if missing,
+# instead of surfacing a confusing 401 from Dev.to on the first publish
+DEVTO_API_KEY = os.environ["DEVTO_API_KEY"]
+DEVTO_HEADERS = {
+    "api-key": DEVTO_API_KEY,
+    "Content-Type": "application/json"
+}
+
+# LLM provider selection: "vertex" (default) or "openai". Both paths go
+# through async clients, so neither can block the event loop.
+PROVIDER = os.getenv("LLM_PROVIDER", "vertex")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+# Name of the model the configured provider will serve requests with
+ACTIVE_MODEL = VERTEX_MODEL if PROVIDER == "vertex" else OPENAI_MODEL
+
+# Bound in-flight upstream LLM calls process-wide so request bursts
+# don't trip provider quotas and trigger 429 retry storms
+LLM_SEM = asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", "16")))
+
+# Initialize FastAPI app, serializing responses with orjson (C
+# implementation, much faster on multi-KB article payloads)
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Gzip article responses (highly compressible markdown) for clients
+# that advertise Accept-Encoding: gzip; tiny bodies are left alone
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
+# Generation parameters, shared by every provider path and by the
+# article cache key so editing them invalidates cached articles
+TEMPERATURE = 0.2       # Lower temperature for more focused output
+TOP_P = 0.8             # Nucleus sampling parameter
+TOP_K = 40              # Top-k sampling parameter
+MAX_OUTPUT_TOKENS = 500  # Maximum length of generated text
+
+# The config is immutable once built, so construct it once at import
+# instead of per request
+GEN_CONFIG = GenerationConfig(
+    temperature=TEMPERATURE,
+    top_p=TOP_P,
+    top_k=TOP_K,
+    max_output_tokens=MAX_OUTPUT_TOKENS,
+)
+
+# Prompt template shared by all generation endpoints
+PROMPT_TMPL = "Write a technical brief article about {title}. Include a real-world scenario example. This article will be published to dev.to so make sure it is formatted correctly. just have only article content in the response no title or anything else add code snippet if needed"
+
+# LRU cache of generated articles, keyed by (model, params, title).
+# Users often click "Generate" repeatedly on the same title, so cache
+# hits skip the LLM call entirely.
+ARTICLE_CACHE: OrderedDict = OrderedDict()
+ARTICLE_CACHE_MAX_ENTRIES = 1024
+
+def article_cache_key(title: str) -> str:
+    """
+    Build the cache key for a generated article.
+
+    The key covers the model name and generation parameters as well as
+    the title, so changing any of them invalidates old entries.
+
+    Args:
+        title: The article title
+
+    Returns:
+        str: Hex digest identifying this (model, params, title) combination
+    """
+    raw = f"{ACTIVE_MODEL}|{TEMPERATURE}|{TOP_P}|{TOP_K}|{MAX_OUTPUT_TOKENS}|{title}"
+    return hashlib.blake2b(raw.encode()).hexdigest()
+
+def cache_article(key: str, article: str):
+    """
+    Store a generated article, evicting the least recently used entry
+    if the cache is full.
+
+    Args:
+        key: Cache key from article_cache_key
+        article: The generated article text
+    """
+    ARTICLE_CACHE[key] = article
+    if len(ARTICLE_CACHE) > ARTICLE_CACHE_MAX_ENTRIES:
+        ARTICLE_CACHE.popitem(last=False)
+
+@app.on_event("startup")
+async def load_model():
+    """
+    Build the configured LLM client once and cache it on app state.
+
+    Doing this at startup keeps the client/auth setup off the
+    per-request critical path.
+    """
+    if PROVIDER == "vertex":
+        # init_vertexai reads credentials from disk, so run it in the
+        # threadpool to keep the boot-time event loop unblocked
+        app.state.gemini_model = await run_in_threadpool(init_vertexai)
+        # Fire a tiny warmup call so the first user request doesn't pay
+        # for the auth token fetch, gRPC channel setup and model load
+        try:
+            await app.state.gemini_model.generate_content_async(
+                "ping", generation_config=GenerationConfig(max_output_tokens=1))
+        except Exception as exc:
+            print(f"Vertex AI warmup call failed: {exc}")
+    # Shared async HTTP client with a keep-alive pool for outbound calls
+    app.state.http = httpx.AsyncClient(
+        timeout=20.0,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        transport=httpx.AsyncHTTPTransport(retries=3),
+    )
+    # OpenAI client, used for live generation when PROVIDER is "openai"
+    # and for the Batch API endpoints in either case
+    app.state.openai_client = AsyncOpenAI() if os.getenv("OPENAI_API_KEY") else None
+    if PROVIDER == "openai" and app.state.openai_client is None:
+        raise RuntimeError("LLM_PROVIDER=openai requires OPENAI_API_KEY to be set")
+
+@app.on_event("shutdown")
+async def close_http_client():
+    """Close the shared HTTP client and its connection pool."""
+    await app.state.http.aclose()
 
 # Define request model for article generation
 class ArticleRequest(BaseModel):
     title: str
 
+# Define request model for batch article generation
+class BatchArticleRequest(BaseModel):
+    titles: list[str]
+
+def build_prompt(title: str) -> str:
+    """
+    Build the article-generation prompt for the given title.
+
+    Args:
+        title: The article title to write about
+
+    Returns:
+        str: The prompt sent to the AI model
+    """
+    return PROMPT_TMPL.format(title=title)
+
+async def generate_text(state, prompt: str) -> str:
+    """
+    Run one generation on the configured provider and return the text.
+
+    Args:
+        state: app.state carrying the cached provider clients
+        prompt: The prompt to send to the model
+
+    Returns:
+        str: The generated article text
+    """
+    async with LLM_SEM:
+        if PROVIDER == "vertex":
+            response = await state.gemini_model.generate_content_async(
+                prompt, generation_config=GEN_CONFIG)
+            return response.text
+        completion = await state.openai_client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=TEMPERATURE,
+            max_tokens=MAX_OUTPUT_TOKENS,
+        )
+        return completion.choices[0].message.content
+
 @app.post("/generate-article")
-async def generate_article(request: ArticleRequest):
+async def generate_article(request: ArticleRequest, http_request: Request):
     """
-    Generate an article based on the provided title using Google's Vertex AI.
-    
+    Generate an article based on the provided title using the configured
+    LLM provider.
+
     Args:
         request: ArticleRequest containing the article title
-        
+        http_request: FastAPI Request, used to access the cached model
+
     Returns:
         JSON response with the generated article
     """
+    # Return a cached article if this exact title was generated before
+    key = article_cache_key(request.title)
+    if key in ARTICLE_CACHE:
+        ARTICLE_CACHE.move_to_end(key)
+        return {"article": ARTICLE_CACHE[key]}
+
     # Create prompt for the AI model
-    prompt = f"Write a technical brief article about {request.title}. Include a real-world scenario example. This article will be published to dev.to so make sure it is formatted correctly. just have only article content in the response no title or anything else add code snippet if needed"
-    
-    # Configure generation parameters
-    generation_config = GenerationConfig(
-        temperature=0.2,  # Lower temperature for more focused output
-        top_p=0.8,        # Nucleus sampling parameter
-        top_k=40,         # Top-k sampling parameter
-        max_output_tokens=500,  # Maximum length of generated text
-    )
-    
-    # Initialize the Vertex AI model
-    model = await init_vertexai()
+    prompt = build_prompt(request.title)
 
-    # Generate content using the model
-    response = model.generate_content(prompt, generation_config=generation_config)
+    # Generate content on the provider's async client so the event loop
+    # can serve other requests during the LLM round trip
+    article = await generate_text(http_request.app.state, prompt)
+
+    # Cache the result for repeat generations of the same title
+    cache_article(key, article)
 
-    # Extract the text from the response
-    article = response.text
-    
     return {"article": article}
 
 
+@app.post("/generate-article/stream")
+async def generate_article_stream(request: ArticleRequest, http_request: Request):
+    """
+    Generate an article and stream it back token by token.
+
+    Streaming cuts the user-visible latency from full-generation time to
+    time-to-first-token; the frontend renders chunks as they arrive.
+
+    Args:
+        request: ArticleRequest containing the article title
+        http_request: FastAPI Request, used to access the cached model
+
+    Returns:
+        StreamingResponse yielding article text chunks
+    """
+    state = http_request.app.state
+    prompt = build_prompt(request.title)
+
+    # Replay a cached article as a single chunk on repeat titles, so
+    # streaming doesn't bypass the article cache
+    key = article_cache_key(request.title)
+    if key in ARTICLE_CACHE:
+        ARTICLE_CACHE.move_to_end(key)
+        return StreamingResponse(iter([ARTICLE_CACHE[key]]),
+                                 media_type="text/event-stream; charset=utf-8")
+
+    # Request a streamed generation from the configured provider. The
+    # generation only runs once StreamingResponse iterates, so the
+    # semaphore is acquired inside the generator and held until the
+    # stream is exhausted — otherwise streamed calls would be unbounded.
+    if PROVIDER == "vertex":
+        async def text_chunks():
+            async with LLM_SEM:
+                stream = await state.gemini_model.generate_content_async(
+                    prompt, generation_config=GEN_CONFIG, stream=True)
+                parts = []
+                async for chunk in stream:
+                    parts.append(chunk.text)
+                    yield chunk.text
+            # Cache the assembled article once the stream completes
+            cache_article(key, "".join(parts))
+    else:
+        async def text_chunks():
+            async with LLM_SEM:
+                stream = await state.openai_client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=TEMPERATURE,
+                    max_tokens=MAX_OUTPUT_TOKENS,
+                    stream=True,
+                )
+                parts = []
+                async for chunk in stream:
+                    text = chunk.choices[0].delta.content or ""
+                    parts.append(text)
+                    yield text
+            # Cache the assembled article once the stream completes
+            cache_article(key, "".join(parts))
+
+    # The explicit charset keeps clients from falling back to latin-1
+    # when decoding the streamed UTF-8 text
+    return StreamingResponse(text_chunks(), media_type="text/event-stream; charset=utf-8")
+
+
+@app.post("/generate-articles")
+async def generate_articles(request: BatchArticleRequest, http_request: Request):
+    """
+    Generate several articles concurrently from a list of titles.
+
+    All LLM calls are issued at once with asyncio.gather, with a
+    semaphore capping how many are in flight against the provider.
+
+    Args:
+        request: BatchArticleRequest containing the article titles
+        http_request: FastAPI Request, used to access the cached model
+
+    Returns:
+        JSON response with the generated articles, in input order
+    """
+    # Cap in-flight LLM calls so a large batch doesn't trip provider quotas
+    semaphore = asyncio.Semaphore(10)
+
+    async def generate_one(title: str) -> str:
+        async with semaphore:
+            return await generate_text(http_request.app.state, build_prompt(title))
+
+    # Fan out all generations concurrently and keep input order
+    articles = await asyncio.gather(*(generate_one(title) for title in request.titles))
+
+    return {"articles": articles}
+
+
+@app.post("/generate-articles/batch")
+async def submit_article_batch(request: BatchArticleRequest, http_request: Request):
+    """
+    Submit a bulk article generation job to OpenAI's Batch API.
+
+    Batch jobs run at 50% of the normal token cost and draw from a
+    separate rate-limit pool, at the price of up to 24h latency — suited
+    for bulk draft generation rather than interactive use.
+
+    Args:
+        request: BatchArticleRequest containing the article titles
+        http_request: FastAPI Request, used to access the OpenAI client
+
+    Returns:
+        JSON response with the batch id to poll via /batches/{batch_id}
+    """
+    client = http_request.app.state.openai_client
+    if client is None:
+        return {"status": "error", "message": "OPENAI_API_KEY is not configured"}
+
+    # Build one JSONL request line per title, keyed by input position
+    lines = []
+    for index, title in enumerate(request.titles):
+        lines.append(json.dumps({
+            "custom_id": str(index),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": os.getenv("OPENAI_BATCH_MODEL", OPENAI_MODEL),
+                "messages": [{"role": "user", "content": build_prompt(title)}],
+                "temperature": TEMPERATURE,
+                "max_tokens": MAX_OUTPUT_TOKENS,
+            },
+        }))
+
+    # Upload the JSONL file and create the batch job
+    batch_file = await client.files.create(
+        file=("articles.jsonl", "\n".join(lines).encode()), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+
+    return {"batch_id": batch.id, "status": batch.status}
+
+
+@app.get("/batches/{batch_id}")
+async def get_batch(batch_id: str, http_request: Request):
+    """
+    Poll an OpenAI batch job and return the articles once completed.
+
+    Args:
+        batch_id: The id returned by /generate-articles/batch
+        http_request: FastAPI Request, used to access the OpenAI client
+
+    Returns:
+        JSON response with the batch status, plus the articles aligned
+        with the submitted titles (null for failed ones) and an errors
+        mapping keyed by input position once the job has completed
+    """
+    client = http_request.app.state.openai_client
+    if client is None:
+        return {"status": "error", "message": "OPENAI_API_KEY is not configured"}
+
+    batch = await client.batches.retrieve(batch_id)
+    if batch.status != "completed":
+        return {"batch_id": batch.id, "status": batch.status}
+
+    articles_by_id = {}
+    errors_by_id = {}
+
+    def record_failure(result):
+        """Record a failed request line under its input position."""
+        error = result.get("error") or {}
+        errors_by_id[result["custom_id"]] = error.get("message", "request failed")
+
+    # Map each output line back to its input position; lines with a
+    # non-200 status carry an error body with no choices
+    if batch.output_file_id is not None:
+        output = await client.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            result = json.loads(line)
+            response = result.get("response")
+            if response is None or response.get("status_code") != 200:
+                record_failure(result)
+                continue
+            content = response["body"]["choices"][0]["message"]["content"]
+            articles_by_id[result["custom_id"]] = content
+
+    # Per-request failures are written to a separate error file
+    if batch.error_file_id is not None:
+        errors_output = await client.files.content(batch.error_file_id)
+        for line in errors_output.text.splitlines():
+            record_failure(json.loads(line))
+
+    # Keep the articles aligned with the submitted titles, with null
+    # placeholders where a request failed
+    total = batch.request_counts.total if batch.request_counts else len(articles_by_id)
+    articles = [articles_by_id.get(str(index)) for index in range(total)]
+
+    return {"batch_id": batch.id, "status": batch.status, "articles": articles,
+            "errors": errors_by_id}
+
+
 # Define request model for publishing to Dev.to
 class PublishRequest(BaseModel):
     title: str
@@ -65,13 +424,14 @@ class PublishRequest(BaseModel):
     published: bool = False  # Default to draft mode
 
 @app.post("/publish-to-devto")
-async def publish_to_devto(request: PublishRequest):
+async def publish_to_devto(request: PublishRequest, http_request: Request):
     """
     Publish an article to Dev.to using their API.
-    
+
     Args:
         request: PublishRequest containing the article title and content
-        
+        http_request: FastAPI Request, used to access the shared HTTP client
+
     Returns:
         JSON response with status and URL or error message
     """
@@ -81,12 +441,6 @@ async def publish_to_devto(request: PublishRequest):
     # Dev.to API endpoint
     devto_url = "https://dev.to/api/articles"
     
-    # Set up headers with API key
-    headers = {
-        "api-key": os.getenv("DEVTO_API_KEY"),
-        "Content-Type": "application/json"
-    }
-    
     # Prepare payload according to Dev.to API requirements
     payload = {
         "article": {
@@ -96,16 +450,33 @@ async def publish_to_devto(request: PublishRequest):
         }
     }
     
-    # Send POST request to Dev.to API
-    response = requests.post(devto_url, json=payload, headers=headers)
+    # Send POST request to Dev.to API on the shared async client so the
+    # event loop is free during the network round trip
+    response = await http_request.app.state.http.post(devto_url, json=payload, headers=DEVTO_HEADERS)
     
-    # Handle response
+    # Decode the body once, straight from the raw bytes — no charset
+    # probe and no second parse on the error path
+    body = response.content
     if response.status_code == 201:
-        return {"status": "success", "url": response.json()["url"]}
+        data = orjson.loads(body)
+        return {"status": "success", "url": data["url"]}
     else:
-        return {"status": "error", "message": response.text}
+        return {"status": "error", "message": body.decode("utf-8", "replace")}
     
 
 # Run the app if this file is executed directly
 if __name__ == "__main__":
-    uvicorn.run("backend:app", host="0.0.0.0", port=8008, reload=True)
\ No newline at end of file
+    if os.getenv("DEV"):
+        # Dev mode: single worker with the filesystem reload watcher
+        uvicorn.run("backend:app", host="0.0.0.0", port=8008, reload=True)
+    else:
+        # Production: one worker per CPU on the uvloop event loop with
+        # the C HTTP parser, no reload watcher
+        uvicorn.run(
+            "backend:app",
+            host="0.0.0.0",
+            port=8008,
+            workers=max(2, os.cpu_count() or 1),
+            loop="uvloop",
+            http="httptools",
+        )
\ No newline at end of file
@@ -2,6 +2,7 @@ import streamlit as st
 import requests
 import os
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 # Load environment variables from .env file
 load_dotenv()
@@ -9,6 +10,19 @@ load_dotenv()
 # Get backend URL from environment variable or use default
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8008")
 
+@st.cache_resource
+def backend_session():
+    """
+    Return a pooled requests.Session shared across Streamlit reruns.
+
+    Every widget interaction reruns this script, so without caching each
+    rerun would open a fresh TCP connection to the backend. The cached
+    session keeps sockets alive and reuses them.
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+    return session
+
 # Main app title
 st.title("Article Generator")
 
@@ -17,41 +31,65 @@ title = st.text_input("Enter article title")
 
 # Generate article button
 if st.button("Generate Article"):
-    # Send request to backend API
-    response = requests.post(
-        f"{BACKEND_URL}/generate-article",
-        json={"title": title}
+    # Send request to backend API over the cached keep-alive session,
+    # asking for a streamed response so tokens render as they arrive
+    response = backend_session().post(
+        f"{BACKEND_URL}/generate-article/stream",
+        json={"title": title},
+        stream=True
     )
-    
-    # If request is successful, store article in session state
+
+    # If request is successful, render the stream and store the article
     if response.status_code == 200:
-        article = response.json()["article"]
+        # Decode as UTF-8 (matching the backend's charset) in chunks
+        # instead of iter_content's one-byte default
+        response.encoding = "utf-8"
+        article = st.write_stream(response.iter_content(chunk_size=1024, decode_unicode=True))
         st.session_state.generated_article = article
         st.session_state.article_title = title
+        # Rerun so the preview section below takes over rendering
+        st.rerun()
 
-# Display article preview if an article has been generated
-if 'generated_article' in st.session_state:
+@st.fragment
+def preview_and_publish():
+    """
+    Render the article preview and the publish button.
+
+    Runs as a fragment so clicking Publish reruns only this block
+    instead of the whole script, skipping the re-render of the title
+    input and the markdown conversion of the full article.
+    """
     st.subheader("Article Preview")
     st.markdown(st.session_state.generated_article)
-    
+
     # Publish to Dev.to button
     if st.button("Publish to Dev.to"):
-        # Send publish request to backend API
-        publish_response = requests.post(
+        # Send publish request to backend API over the cached session
+        publish_response = backend_session().post(
             f"{BACKEND_URL}/publish-to-devto",
             json={
                 "title": st.session_state.article_title,
                 "content": st.session_state.generated_article
             }
         )
-        
+
         # Handle publish response
         if publish_response.status_code == 200:
-            # Show success message with article URL
-            st.success(f"Article published successfully! View it at: {publish_response.json()['url']}")
-            # Clean up session state
+            # Stash the URL so the success banner survives the rerun,
+            # clean up session state and refresh the whole page
+            st.session_state.published_url = publish_response.json()['url']
             del st.session_state.generated_article
             del st.session_state.article_title
+            st.rerun(scope="app")
         else:
             # Show error message
-            st.error(f"Failed to publish article: {publish_response.json()['message']}")
\ No newline at end of file
+            st.error(f"Failed to publish article: {publish_response.json()['message']}")
+
+# Show the success message for an article published on the previous
+# run; pop so it clears on the next interaction
+if 'published_url' in st.session_state:
+    st.success(f"Article published successfully! View it at: {st.session_state.pop('published_url')}")
+
+# Display article preview if an article has been generated
+if 'generated_article' in st.session_state:
+    preview_and_publish()
\ No newline at end of file